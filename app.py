@@ -1,30 +1,73 @@
-from flask import Flask, render_template, redirect, url_for, request, session, flash
+from flask import Flask, g, render_template, redirect, url_for, request, flash, abort
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin, LoginManager, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError, InvalidHash
 from fractions import Fraction
-import json
+import functools
+import itertools
+import jinja2
+import mmap
+import orjson
+import re
 import os
+import sqlite3
 import urllib.parse
 
 app = Flask(__name__)
 app.secret_key = "super_secret_key"
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///mealplanner.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Reuse pooled connections across requests; pre-ping drops dead ones instead
+# of failing the request, which matters once this moves off local SQLite.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_pre_ping': True,
+    'pool_recycle': 300,
+}
+# The session only carries the login id and flashed messages; skip re-signing
+# and re-sending the cookie on responses that didn't change it.
+app.config['SESSION_REFRESH_EACH_REQUEST'] = False
+
+DEBUG = os.environ.get("FLASK_DEBUG") == "1"
+if not DEBUG:
+    # Don't stat templates on every render, and keep compiled templates on
+    # disk so fresh workers skip recompilation.
+    app.jinja_env.auto_reload = False
+    app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache()
 
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
+# Argon2's C backend releases the GIL while hashing, so logins don't stall
+# the other workers the way werkzeug's pure-Python PBKDF2 loop did.
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+
+def _set_sqlite_pragmas(dbapi_conn, _record):
+    # WAL + NORMAL sync: small commits (view counts, toggles, registrations)
+    # no longer pay a full fsync each, and readers don't block the writer.
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+with app.app_context():
+    db.event.listen(db.engine, "connect", _set_sqlite_pragmas)
+
 
 # --- DATABASE MODELS ---
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
-    ready_to_cook_ids = db.Column(db.Text, default='[]')
-    favorite_ids = db.Column(db.Text, default='[]')
-    items = db.relationship('ShoppingItem', backref='owner', lazy=True)
+    # lazy='raise' so an accidental item.owner / user.items walk fails fast
+    # instead of silently issuing a per-row SELECT; no view needs either side.
+    items = db.relationship('ShoppingItem', back_populates='owner', lazy='raise')
 
 
 class ShoppingItem(db.Model):
@@ -34,6 +77,11 @@ class ShoppingItem(db.Model):
     unit = db.Column(db.String(50))
     category = db.Column(db.String(50), default="Other")
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    owner = db.relationship('User', back_populates='items', lazy='raise')
+    __table_args__ = (db.Index('ix_si_user_name_unit', 'user_id', 'name', 'unit'),
+                      # Serves the shopping-list page: filter on user_id,
+                      # rows come back already ordered by category.
+                      db.Index('ix_shopping_user_cat', 'user_id', 'category'))
 
 
 class RecipeStats(db.Model):
@@ -41,16 +89,77 @@ class RecipeStats(db.Model):
     view_count = db.Column(db.Integer, default=0)
 
 
+class UserRecipeFlag(db.Model):
+    # One row per (user, recipe, kind) instead of JSON id lists on User:
+    # membership checks and toggles become indexed row operations.
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    recipe_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # 'fav' or 'ready'
+    __table_args__ = (db.UniqueConstraint('user_id', 'recipe_id', 'kind'),
+                      # Covers the per-recipe COUNT queries without touching rows
+                      db.Index('ix_urf_recipe_kind_user', 'recipe_id', 'kind', 'user_id'),
+                      # Covers the navbar badge COUNTs that run on every render
+                      db.Index('ix_urf_user_kind', 'user_id', 'kind'))
+
+
+def _backfill_legacy_flags():
+    # Older databases stored saved/favorite recipes as JSON id lists on the
+    # user row. Copy them into user_recipe_flag rows once, then blank the
+    # legacy columns so a later toggle can't be resurrected on reboot.
+    cols = {row[1] for row in db.session.execute(db.text("PRAGMA table_info(user)"))}
+    if not {'favorite_ids', 'ready_to_cook_ids'} & cols:
+        return
+    for uid, fav_json, ready_json in db.session.execute(
+            db.text("SELECT id, favorite_ids, ready_to_cook_ids FROM user")):
+        for kind, raw in (('fav', fav_json), ('ready', ready_json)):
+            for rid in (orjson.loads(raw) if raw else []):
+                db.session.execute(db.text(
+                    "INSERT OR IGNORE INTO user_recipe_flag (user_id, recipe_id, kind) "
+                    "VALUES (:u, :r, :k)"), {'u': uid, 'r': rid, 'k': kind})
+    db.session.execute(db.text("UPDATE user SET favorite_ids = NULL, ready_to_cook_ids = NULL"))
+    db.session.commit()
+
+
+def _ensure_indexes():
+    # create_all skips tables that already exist, so indexes added to the
+    # models never reach a database created before them. Emit them
+    # explicitly; IF NOT EXISTS makes each a no-op once present.
+    for stmt in (
+        "CREATE INDEX IF NOT EXISTS ix_si_user_name_unit ON shopping_item (user_id, name, unit)",
+        "CREATE INDEX IF NOT EXISTS ix_shopping_user_cat ON shopping_item (user_id, category)",
+        "CREATE INDEX IF NOT EXISTS ix_urf_recipe_kind_user ON user_recipe_flag (recipe_id, kind, user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_urf_user_kind ON user_recipe_flag (user_id, kind)",
+    ):
+        db.session.execute(db.text(stmt))
+    db.session.commit()
+
+
+# At import time, not under __main__: the gunicorn path never runs the
+# __main__ block, so the new table has to be created (and the legacy data
+# carried over) here. All steps are no-ops on an up-to-date database.
+with app.app_context():
+    db.create_all()
+    _ensure_indexes()
+    _backfill_legacy_flags()
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Cached on g: Flask-Login may call this several times per request.
+    # session.get itself hits the identity map first and skips Query
+    # construction on the one fetch that does happen.
+    if 'user' not in g:
+        g.user = db.session.get(User, int(user_id))
+    return g.user
 
 
 # --- TEMPLATE FILTERS ---
-@app.template_filter("fraction")
-def fraction_formatter(amount):
+@functools.lru_cache(maxsize=1024)
+def _format_fraction(amount):
+    # Cached: the filter runs per ingredient per render and the same handful
+    # of amounts (1, 0.5, 0.25, ...) repeat across recipes.
     try:
-        if amount is None or amount == 0: return ""
         fraction = Fraction(str(amount)).limit_denominator(8)
         if fraction.denominator == 1: return str(fraction.numerator)
         if fraction.numerator > fraction.denominator:
@@ -58,46 +167,164 @@ def fraction_formatter(amount):
             remainder = fraction.numerator % fraction.denominator
             return f"{whole} {Fraction(remainder, fraction.denominator)}"
         return str(fraction)
-    except:
+    except (ValueError, TypeError, ZeroDivisionError):
         return str(amount)
 
 
+@app.template_filter("fraction")
+def fraction_formatter(amount):
+    if amount is None or amount == 0: return ""
+    return _format_fraction(amount)
+
+
 # --- UTILITY FUNCTIONS ---
-def load_recipes():
+RECIPES_FILE = "recipes.jsonl"
+PAGE_SIZE = 24  # recipes per homepage request
+_recipes_cache = None
+_recipes_index = {}
+_recipes_mtime = None
+
+
+def _trigram_fingerprint(text):
+    # 64-bit bitmask of the string's character trigrams. A query can only be a
+    # substring if all of its trigram bits are set, so a couple of integer ops
+    # reject most non-matches before the real substring check runs.
+    mask = 0
+    for i in range(len(text) - 2):
+        mask |= 1 << (hash(text[i:i + 3]) & 63)
+    return mask
+
+
+def get_recipes():
+    # Cache the parsed recipe list and only re-read the file when it changes,
+    # so each request skips the disk read + json parse + annotation loop.
+    global _recipes_cache, _recipes_index, _recipes_mtime
     try:
-        with open("recipes.json", "r") as file:
-            data = json.load(file)
-            for i, r in enumerate(data):
-                r['original_index'] = i
-                r['total_time'] = (r.get('prep_time') or 0) + (r.get('cook_time') or 0)
-                if r['total_time'] == 0: r['total_time'] = 30
-            return data
+        mtime = os.stat(RECIPES_FILE).st_mtime
+        if _recipes_cache is not None and mtime == _recipes_mtime:
+            return _recipes_cache
+
+        # One recipe per line (NDJSON): the fetcher can append without
+        # rewriting the file, and loading is a single streaming pass over
+        # the mmap'd page cache.
+        with open(RECIPES_FILE, "rb") as file:
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                data = [orjson.loads(line) for line in iter(mm.readline, b"") if line.strip()]
+            finally:
+                mm.close()
+        for i, r in enumerate(data):
+            r['original_index'] = i
+            r['total_time'] = (r.get('prep_time') or 0) + (r.get('cook_time') or 0)
+            if r['total_time'] == 0: r['total_time'] = 30
+            r['_name_lower'] = (r.get('name') or '').lower()
+            r['_fingerprint'] = _trigram_fingerprint(r['_name_lower'])
+            # Unit-separator joined so a query can't match across two
+            # ingredients; one substring test replaces a per-ingredient loop.
+            r['_ing_blob_lower'] = '\x1f'.join(r.get('ingredients', [])).lower()
+        _recipes_cache = data
+        _recipes_index = {r['original_index']: r for r in data}
+        _recipes_mtime = mtime
+        return data
     except Exception as e:
         print(f"Error loading recipes: {e}")
         return []
 
 
-def split_ingredient(ingredient):
-    parts = ingredient.split(" ", 2)
-    if len(parts) < 3: return 1.0, "", ingredient
+def get_recipe(recipe_id):
+    # O(1) lookup in the cached index instead of scanning the recipe list.
+    get_recipes()
+    return _recipes_index.get(recipe_id)
+
+
+_fts_conn = None
+_fts_mtime = None
+
+
+def _get_fts_index():
+    # In-memory FTS5 index over the cached recipes, rebuilt only when
+    # the recipes file changes on disk.
+    global _fts_conn, _fts_mtime
+    recipes = get_recipes()
+    if _fts_conn is not None and _fts_mtime == _recipes_mtime:
+        return _fts_conn
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE VIRTUAL TABLE recipes_fts USING fts5(name, ingredients, tokenize='unicode61')")
+    conn.executemany(
+        "INSERT INTO recipes_fts (rowid, name, ingredients) VALUES (?, ?, ?)",
+        [(r['original_index'], r.get('name') or '', ' '.join(r.get('ingredients', []))) for r in recipes])
+    conn.commit()
+    _fts_conn = conn
+    _fts_mtime = _recipes_mtime
+    return conn
+
+
+def search_recipes(query):
+    # Indexed token/prefix search over names and ingredients, instead of a
+    # Python-side scan of every ingredient of every recipe. Queries that can't
+    # be expressed as FTS tokens fall back to the substring filter.
+    recipes = get_recipes()
     try:
-        amount = float(Fraction(parts[0]))
-        return amount, parts[1].strip(), parts[2].strip()
-    except:
-        return 1.0, "pcs", ingredient
+        match = ' '.join('"%s"*' % tok.replace('"', '""') for tok in query.split())
+        rows = _get_fts_index().execute(
+            "SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH ? ORDER BY rowid", (match,)).fetchall()
+        return [recipes[row[0]] for row in rows if row[0] < len(recipes)]
+    except sqlite3.Error:
+        qfp = _trigram_fingerprint(query)
+        return [r for r in recipes if
+                ((qfp & r['_fingerprint']) == qfp and query in r['_name_lower']) or
+                query in r['_ing_blob_lower']]
+
+
+def get_flag_ids(user_id, kind):
+    return {f.recipe_id for f in UserRecipeFlag.query.filter_by(user_id=user_id, kind=kind).all()}
+
+
+# One pass pulls amount/unit/name; malformed lines fall through to the
+# defaults instead of paying Fraction's parser plus exception unwinding.
+# The unit group is \S* with single-space separators: lines like
+# "2  tomatoes" carry an empty unit (split(" ", 2) gave an empty middle
+# token), and the quantity must still parse.
+_ING_RE = re.compile(r"^\s*(\d+\s+\d+/\d+|\d+/\d+|\d*\.?\d+)\s(\S*)\s(\S.*)$")
+
+
+def split_ingredient(ingredient):
+    m = _ING_RE.match(ingredient)
+    if not m:
+        # Same defaults as before: bare names keep an empty unit, longer
+        # lines without a leading amount count as "pcs".
+        return 1.0, "pcs" if ingredient.count(" ") >= 2 else "", ingredient
+    amount, unit, name = m.groups()
+    if "/" in amount:
+        whole, _, frac = amount.rpartition(" ")
+        num, den = frac.split("/")
+        value = (float(whole) if whole else 0.0) + (int(num) / int(den) if int(den) else 0.0)
+    else:
+        value = float(amount)
+    return value, unit, name.strip()
+
+
+# Built once at import; get_category used to rebuild this dict per call.
+CATEGORY_KEYWORDS = {
+    "Produce": ["apple", "onion", "garlic", "spinach", "tomato", "potato", "carrot", "lime", "lemon", "herb"],
+    "Meat/Seafood": ["chicken", "beef", "pork", "shrimp", "salmon", "steak", "bacon"],
+    "Dairy/Refrigerated": ["milk", "cheese", "butter", "eggs", "yogurt", "cream"],
+    "Pantry": ["flour", "sugar", "salt", "pepper", "oil", "pasta", "syrup", "vinegar"],
+    "Frozen": ["frozen", "ice cream", "pizza"]
+}
+# One compiled alternation per category: five C-level scans per item name
+# instead of up to 38 Python-level substring checks. Category order still
+# decides priority, as before.
+_CATEGORY_PATTERNS = [
+    (cat, re.compile("|".join(re.escape(kw) for kw in kws)))
+    for cat, kws in CATEGORY_KEYWORDS.items()
+]
 
 
 def get_category(item_name):
     item_name = item_name.lower()
-    categories = {
-        "Produce": ["apple", "onion", "garlic", "spinach", "tomato", "potato", "carrot", "lime", "lemon", "herb"],
-        "Meat/Seafood": ["chicken", "beef", "pork", "shrimp", "salmon", "steak", "bacon"],
-        "Dairy/Refrigerated": ["milk", "cheese", "butter", "eggs", "yogurt", "cream"],
-        "Pantry": ["flour", "sugar", "salt", "pepper", "oil", "pasta", "syrup", "vinegar"],
-        "Frozen": ["frozen", "ice cream", "pizza"]
-    }
-    for category, keywords in categories.items():
-        if any(kw in item_name for kw in keywords): return category
+    for cat, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(item_name): return cat
     return "Other"
 
 
@@ -105,75 +332,92 @@ def get_category(item_name):
 
 @app.route("/")
 def main_page():
-    all_recipes = load_recipes()
+    all_recipes = get_recipes()
     search_query = request.args.get('search', '').lower()
 
-    # 1. Aggregate Community Stats
-    all_users = User.query.all()
-    global_fav_counts = {}
-    global_save_counts = {}
-    view_stats = {s.recipe_id: s.view_count for s in RecipeStats.query.all()}
-
-    for u in all_users:
-        for fid in json.loads(u.favorite_ids or '[]'):
-            global_fav_counts[fid] = global_fav_counts.get(fid, 0) + 1
-        for sid in json.loads(u.ready_to_cook_ids or '[]'):
-            global_save_counts[sid] = global_save_counts.get(sid, 0) + 1
-
-    # 2. Map Stats to Recipes
-    for r in all_recipes:
-        idx = r['original_index']
-        r['global_favs'] = global_fav_counts.get(idx, 0)
-        r['global_saves'] = global_save_counts.get(idx, 0)
-        r['global_views'] = view_stats.get(idx, 0)
-
-    # 3. Apply Search Filter
-    if search_query:
-        recipes = [r for r in all_recipes if search_query in r['name'].lower() or
-                   any(search_query in ing.lower() for ing in r.get('ingredients', []))]
-    else:
-        recipes = all_recipes
+    # 1. Apply Search Filter
+    base = search_recipes(search_query) if search_query else all_recipes
 
-    return render_template("main_page.html", recipes=recipes)
+    # 2. Paginate before annotating: only the visible window gets stats
+    # and HTML, so a growing corpus doesn't grow the per-request work.
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    window = base[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    window_ids = [r['original_index'] for r in window]
+
+    # 3. Aggregate Community Stats for the window only: one GROUP BY over
+    # the flag table covers both favourites and saves.
+    view_stats = {s.recipe_id: s.view_count
+                  for s in RecipeStats.query.filter(RecipeStats.recipe_id.in_(window_ids))}
+    global_fav_counts, global_save_counts = {}, {}
+    flag_rows = (db.session.query(UserRecipeFlag.kind, UserRecipeFlag.recipe_id, db.func.count())
+                 .filter(UserRecipeFlag.recipe_id.in_(window_ids))
+                 .group_by(UserRecipeFlag.kind, UserRecipeFlag.recipe_id).all())
+    for kind, rid, n in flag_rows:
+        (global_fav_counts if kind == 'fav' else global_save_counts)[rid] = n
+
+    # 4. Overlay stats onto shallow copies so the shared recipe cache is
+    # never mutated per request.
+    recipes = [{**r,
+                'global_favs': global_fav_counts.get(r['original_index'], 0),
+                'global_saves': global_save_counts.get(r['original_index'], 0),
+                'global_views': view_stats.get(r['original_index'], 0)} for r in window]
+
+    return render_template("main_page.html", recipes=recipes, page=page,
+                           has_next=page * PAGE_SIZE < len(base))
 
 
 @app.route("/recipe/<int:recipe_id>", methods=["GET", "POST"])
 def recipe_details(recipe_id):
-    all_recipes = load_recipes()
-    recipe = next((r for r in all_recipes if r['original_index'] == recipe_id), None)
+    recipe = get_recipe(recipe_id)
 
     if not recipe:
         flash("Recipe not found!")
         return redirect(url_for('main_page'))
 
-    # Update Views
-    stats = RecipeStats.query.get(recipe_id)
-    if not stats:
-        stats = RecipeStats(recipe_id=recipe_id, view_count=1)
-        db.session.add(stats)
-    else:
-        stats.view_count += 1
+    # Update Views: ship only the +1 delta instead of load-modify-write,
+    # which also avoids losing counts to concurrent viewers.
+    updated = db.session.execute(
+        db.update(RecipeStats).where(RecipeStats.recipe_id == recipe_id)
+        .values(view_count=RecipeStats.view_count + 1))
+    if updated.rowcount == 0:
+        db.session.add(RecipeStats(recipe_id=recipe_id, view_count=1))
     db.session.commit()
 
-    # Community counts for display
-    all_users = User.query.all()
-    recipe['global_favs'] = sum(1 for u in all_users if recipe_id in json.loads(u.favorite_ids or '[]'))
-    recipe['global_saves'] = sum(1 for u in all_users if recipe_id in json.loads(u.ready_to_cook_ids or '[]'))
-    recipe['global_views'] = stats.view_count
+    # Community counts for display (on a copy, not the cached dict).
+    # Indexed COUNTs; no flag rows are materialized.
+    flag_count = db.session.query(db.func.count(UserRecipeFlag.id))
+    recipe = {**recipe,
+              'global_favs': flag_count.filter_by(recipe_id=recipe_id, kind='fav').scalar(),
+              'global_saves': flag_count.filter_by(recipe_id=recipe_id, kind='ready').scalar(),
+              'global_views': db.session.query(RecipeStats.view_count).filter_by(recipe_id=recipe_id).scalar()}
 
     if request.method == "POST":
         if not current_user.is_authenticated:
             return redirect(url_for('login'))
 
+        # One SELECT up front instead of a lookup per ingredient (N+1 fix):
+        # existing rows are merged in memory, new ones inserted in one statement.
+        existing = {(i.name, i.unit): i for i in ShoppingItem.query.filter_by(user_id=current_user.id).all()}
+        new_rows = {}
         for ing in recipe.get("ingredients", []):
             amt, unit, name = split_ingredient(ing)
-            db.session.add(
-                ShoppingItem(name=name, quantity=amt, unit=unit, category=get_category(name), user_id=current_user.id))
+            item = existing.get((name, unit))
+            if item:
+                item.quantity += amt
+            elif (name, unit) in new_rows:
+                new_rows[(name, unit)]['quantity'] += amt
+            else:
+                new_rows[(name, unit)] = {'name': name, 'quantity': amt, 'unit': unit,
+                                          'category': get_category(name), 'user_id': current_user.id}
+        if new_rows:
+            db.session.bulk_insert_mappings(ShoppingItem, list(new_rows.values()))
 
-        ready_ids = json.loads(current_user.ready_to_cook_ids or '[]')
-        if recipe_id not in ready_ids:
-            ready_ids.append(recipe_id)
-            current_user.ready_to_cook_ids = json.dumps(ready_ids)
+        ready = UserRecipeFlag.query.filter_by(user_id=current_user.id, recipe_id=recipe_id, kind='ready').first()
+        if not ready:
+            db.session.add(UserRecipeFlag(user_id=current_user.id, recipe_id=recipe_id, kind='ready'))
 
         db.session.commit()
         return redirect(url_for('shopping_list'))
@@ -186,11 +430,16 @@ def recipe_details(recipe_id):
 @app.route("/shopping-list")
 @login_required
 def shopping_list():
-    items = ShoppingItem.query.filter_by(user_id=current_user.id).all()
+    # Fetch just the rendered columns, pre-sorted by category so grouping is a
+    # single groupby pass instead of one list scan per category.
+    rows = (ShoppingItem.query.filter_by(user_id=current_user.id)
+            .order_by(ShoppingItem.category)
+            .with_entities(ShoppingItem.id, ShoppingItem.name, ShoppingItem.quantity,
+                           ShoppingItem.unit, ShoppingItem.category))
+    by_cat = {cat: list(group) for cat, group in itertools.groupby(rows, key=lambda row: row.category)}
     categories = ["Produce", "Meat/Seafood", "Dairy/Refrigerated", "Pantry", "Frozen", "Other"]
-    grouped_items = {cat: [i for i in items if i.category == cat] for cat in categories}
-    filtered_grouped = {k: v for k, v in grouped_items.items() if v}
-    return render_template("shopping_list.html", grouped_items=filtered_grouped)
+    grouped_items = {cat: by_cat[cat] for cat in categories if cat in by_cat}
+    return render_template("shopping_list.html", grouped_items=grouped_items)
 
 
 @app.route("/add-custom-item", methods=["POST"])
@@ -208,7 +457,7 @@ def add_custom_item():
 @app.route("/delete-item/<int:item_id>", methods=["POST"])
 @login_required
 def delete_item(item_id):
-    item = ShoppingItem.query.get_or_404(item_id)
+    item = db.session.get(ShoppingItem, item_id) or abort(404)
     if item.user_id == current_user.id:
         db.session.delete(item)
         db.session.commit()
@@ -274,24 +523,24 @@ def share_list():
 @app.route("/ready-to-cook", methods=["GET", "POST"])
 @login_required
 def saved_recipes():
-    all_recipes = load_recipes()
-    ready_ids = json.loads(current_user.ready_to_cook_ids or '[]')
-    fav_ids = json.loads(current_user.favorite_ids or '[]')
+    all_recipes = get_recipes()
 
     if request.method == "POST":
         recipe_id = int(request.form.get("recipe_id"))
         if "toggle_fav" in request.form:
-            if recipe_id in fav_ids:
-                fav_ids.remove(recipe_id)
+            fav = UserRecipeFlag.query.filter_by(user_id=current_user.id, recipe_id=recipe_id, kind='fav').first()
+            if fav:
+                db.session.delete(fav)
             else:
-                fav_ids.append(recipe_id)
-            current_user.favorite_ids = json.dumps(fav_ids)
+                db.session.add(UserRecipeFlag(user_id=current_user.id, recipe_id=recipe_id, kind='fav'))
         elif "remove_ready" in request.form:
-            if recipe_id in ready_ids: ready_ids.remove(recipe_id)
-            current_user.ready_to_cook_ids = json.dumps(ready_ids)
+            ready = UserRecipeFlag.query.filter_by(user_id=current_user.id, recipe_id=recipe_id, kind='ready').first()
+            if ready: db.session.delete(ready)
         db.session.commit()
         return redirect(url_for('saved_recipes'))
 
+    ready_ids = get_flag_ids(current_user.id, 'ready')
+    fav_ids = get_flag_ids(current_user.id, 'fav')
     display_saved = [r for r in all_recipes if r.get('original_index') in ready_ids]
     return render_template("saved_recipes.html", saved_recipes=display_saved, fav_ids=fav_ids)
 
@@ -299,18 +548,34 @@ def saved_recipes():
 @app.route("/favorites")
 @login_required
 def favorite_recipes():
-    all_recipes = load_recipes()
-    fav_ids = json.loads(current_user.favorite_ids or '[]')
+    all_recipes = get_recipes()
+    fav_ids = get_flag_ids(current_user.id, 'fav')
     display_favorites = [r for r in all_recipes if r.get('original_index') in fav_ids]
     return render_template("favorite_recipes.html", favorite_recipes=display_favorites)
 
 
 # --- AUTH ROUTES ---
 
+def verify_password(user, password):
+    try:
+        password_hasher.verify(user.password, password)
+        return True
+    except VerifyMismatchError:
+        return False
+    except InvalidHash:
+        # Account predates the argon2 switch; check the old PBKDF2 hash and
+        # upgrade it in place on success.
+        if check_password_hash(user.password, password):
+            user.password = password_hasher.hash(password)
+            db.session.commit()
+            return True
+        return False
+
+
 @app.route("/register", methods=["GET", "POST"])
 def register():
     if request.method == "POST":
-        hashed_pw = generate_password_hash(request.form.get("password"), method='pbkdf2:sha256')
+        hashed_pw = password_hasher.hash(request.form.get("password"))
         db.session.add(User(email=request.form.get("email"), password=hashed_pw))
         db.session.commit()
         return redirect(url_for('login'))
@@ -320,9 +585,10 @@ def register():
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
+        password = request.form.get("password")
         user = User.query.filter_by(email=request.form.get("email")).first()
-        if user and check_password_hash(user.password, request.form.get("password")):
-            login_user(user);
+        if user and verify_password(user, password):
+            login_user(user)
             return redirect(url_for('main_page'))
     return render_template("auth.html", action="Login")
 
@@ -338,14 +604,15 @@ def logout():
 @app.context_processor
 def inject_global_counts():
     if current_user.is_authenticated:
+        # Runs for every render: count on the flag table's PK index instead
+        # of loading the id sets just to take their length.
+        flag_count = db.session.query(db.func.count(UserRecipeFlag.id)).filter_by(user_id=current_user.id)
         return {
-            'ready_count': len(json.loads(current_user.ready_to_cook_ids or '[]')),
-            'fav_count': len(json.loads(current_user.favorite_ids or '[]'))
+            'ready_count': flag_count.filter_by(kind='ready').scalar(),
+            'fav_count': flag_count.filter_by(kind='fav').scalar()
         }
     return {'ready_count': 0, 'fav_count': 0}
 
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=DEBUG)
\ No newline at end of file
@@ -1,17 +1,21 @@
 import requests
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import json
-import time
+import orjson
 
 load_dotenv()
 API_KEY = os.getenv('SPOONACULAR_API_KEY')
 
+# One session for all batches: keep-alive reuses the TCP+TLS connection
+# instead of paying a fresh handshake per requests.get
+session = requests.Session()
+
 
 def fetch_recipes(number):
     # random?number=X is the best way to get fresh data
     url = f"https://api.spoonacular.com/recipes/random?apiKey={API_KEY}&number={number}"
-    response = requests.get(url)
+    response = session.get(url)
     if response.status_code == 200:
         return response.json().get('recipes', [])
     return []
@@ -62,34 +66,28 @@ def format_recipes(recipes):
     return formatted
 
 
-def append_recipes(total_to_add, batch_size):
-    all_recipes = []
-
-    # LOAD EXISTING DATA (So we don't delete it)
-    if os.path.exists("recipes.json"):
-        with open("recipes.json", "r") as f:
-            try:
-                all_recipes = json.load(f)
-                print(f"Loaded {len(all_recipes)} existing recipes.")
-            except:
-                print("Fresh start.")
+def append_recipes(total_to_add, batch_size, max_workers=4):
+    # Fetch batches concurrently; the worker cap doubles as the rate limit
+    # so we stay polite to the API without sleeping between batches.
+    batches = [batch_size] * (total_to_add // batch_size)
+    if total_to_add % batch_size:
+        batches.append(total_to_add % batch_size)
 
     added = 0
-    while added < total_to_add:
-        current_batch = min(batch_size, total_to_add - added)
-        raw = fetch_recipes(current_batch)
-        if not raw: break
-
-        formatted = format_recipes(raw)
-        all_recipes.extend(formatted)
-
-        # SAVE EVERYTHING BACK
-        with open("recipes.json", "w") as f:
-            json.dump(all_recipes, f, indent=4)
-
-        added += len(formatted)
-        print(f"Progress: {added}/{total_to_add} added.")
-        time.sleep(1)  # Be nice to the API
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for raw in pool.map(fetch_recipes, batches):
+            if not raw: continue
+            formatted = format_recipes(raw)
+
+            # APPEND ONLY (one JSON line per recipe)
+            # No reparse/rewrite of the existing data, so each batch is
+            # O(batch) instead of O(total recipes collected so far).
+            with open("recipes.jsonl", "ab") as f:
+                for r in formatted:
+                    f.write(orjson.dumps(r) + b"\n")
+
+            added += len(formatted)
+            print(f"Progress: {added}/{total_to_add} added.")
 
 
 if __name__ == "__main__":
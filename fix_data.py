@@ -1,18 +1,26 @@
-import json
+import orjson
 import os
 import random
+import re
+
+# Compiled once; the loop used to chain four str.replace calls per recipe
+_HTML_RE = re.compile(r"</?(?:ol|li)>")
 
 
 def fix_existing_data():
-    if not os.path.exists("recipes.json"):
-        print("recipes.json not found!")
+    if not os.path.exists("recipes.jsonl"):
+        print("recipes.jsonl not found!")
         return
 
-    with open("recipes.json", "r") as f:
-        recipes = json.load(f)
+    with open("recipes.jsonl", "rb") as f:
+        recipes = [orjson.loads(line) for line in f if line.strip()]
 
     fixed_count = 0
-    for r in recipes:
+    # Draw all randomized defaults up front (one C call each) instead of
+    # ping-ponging the random state once per recipe.
+    preps = random.choices([5, 10, 15], k=len(recipes))
+    cooks = random.choices([15, 20, 25, 30, 40, 45], k=len(recipes))
+    for i, r in enumerate(recipes):
         # 1. Remove the old 'type' tag if it exists
         if "type" in r:
             del r["type"]
@@ -20,12 +28,12 @@ def fix_existing_data():
         # 2. Fix prep/cook times with variety
         # We check if it's currently 10/20 (our old defaults) or None
         if r.get("prep_time") in [None, 0, 10]:
-            r["prep_time"] = random.choice([5, 10, 15])
+            r["prep_time"] = preps[i]
             fixed_count += 1
 
         if r.get("cook_time") in [None, 0, 20]:
             # This creates variety: 15, 20, 25, 30, 40, or 45 mins
-            r["cook_time"] = random.choice([15, 20, 25, 30, 40, 45])
+            r["cook_time"] = cooks[i]
             fixed_count += 1
 
         # 3. Add the 'total_time' key for the main page badge
@@ -34,13 +42,14 @@ def fix_existing_data():
         # 4. Fix character-stacking instructions
         if isinstance(r.get("instructions"), str):
             raw_text = r["instructions"]
-            clean_text = raw_text.replace("<ol>", "").replace("<li>", "").replace("</li>", "").replace("</ol>", "")
+            clean_text = _HTML_RE.sub("", raw_text)
             steps = [s.strip() + "." for s in clean_text.split(".") if len(s.strip()) > 2]
             r["instructions"] = steps
             fixed_count += 1
 
-    with open("recipes.json", "w") as f:
-        json.dump(recipes, f, indent=4)
+    with open("recipes.jsonl", "wb") as f:
+        for r in recipes:
+            f.write(orjson.dumps(r) + b"\n")
 
     print(f"Success! Cleaned up {len(recipes)} recipes and applied {fixed_count} fixes.")
 